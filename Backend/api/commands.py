@@ -0,0 +1,60 @@
+"""Maintenance commands exposed through the Flask CLI.
+
+Usage (from the project root):
+
+    $ export FLASK_APP=Backend.run:create_app
+    $ flask backfill-locations
+    $ flask archive-jobs --dry-run
+    $ flask backfill-fingerprints
+"""
+
+from datetime import datetime, timedelta
+
+import click
+
+from .models import (
+    archive_stale_jobs, backfill_fingerprints, backfill_job_locations, count_duplicate_fingerprints,
+    count_stale_jobs, get_session,
+)
+
+
+def register_commands(app):
+    """Attach the maintenance commands to *app*.cli."""
+
+    @app.cli.command('backfill-locations')
+    @click.option('--batch-size', default=1000, show_default=True, help='Jobs processed per transaction.')
+    def backfill_locations_command(batch_size):
+        """Parse existing Location strings into the job_locations table."""
+        filled = backfill_job_locations(get_session(), batch_size=batch_size)
+        click.echo(f'Backfilled locations for {filled} jobs.')
+
+    @app.cli.command('backfill-fingerprints')
+    @click.option('--batch-size', default=1000, show_default=True, help='Jobs processed per transaction.')
+    def backfill_fingerprints_command(batch_size):
+        """Compute near-duplicate fingerprints for existing jobs."""
+        db_session = get_session()
+        filled = backfill_fingerprints(db_session, batch_size=batch_size)
+        click.echo(f'Backfilled fingerprints for {filled} jobs.')
+        duplicates = count_duplicate_fingerprints(db_session)
+        if duplicates:
+            click.echo(f'{duplicates} fingerprints are shared by more than one job; review and delete the extras.')
+
+    @app.cli.command('archive-jobs')
+    @click.option('--days', type=int, default=None,
+                  help='Archive jobs not seen for this many days (default: JOB_RETENTION_DAYS).')
+    @click.option('--batch-size', type=int, default=None,
+                  help='Jobs moved per transaction (default: ARCHIVE_BATCH_SIZE).')
+    @click.option('--dry-run', is_flag=True, help='Only report how many jobs would be archived.')
+    def archive_jobs_command(days, batch_size, dry_run):
+        """Move stale jobs from the live table into jobs_archive."""
+        days = app.config['JOB_RETENTION_DAYS'] if days is None else days
+        batch_size = app.config['ARCHIVE_BATCH_SIZE'] if batch_size is None else batch_size
+        cutoff = datetime.utcnow() - timedelta(days=days)
+
+        if dry_run:
+            stale = count_stale_jobs(get_session(), cutoff)
+            click.echo(f'{stale} jobs last seen before {cutoff.isoformat()} would be archived.')
+            return
+
+        archived = archive_stale_jobs(get_session(), cutoff, batch_size=batch_size)
+        click.echo(f'Archived {archived} jobs last seen before {cutoff.isoformat()}.')
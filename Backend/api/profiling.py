@@ -0,0 +1,181 @@
+"""Opt-in per-request profiler with SQL query-plan capture.
+
+Enabled with ``PROFILING_ENABLED`` in the config. Once enabled, only requests
+that carry the ``PROFILING_HEADER`` header are profiled; all other requests
+skip straight through. A profiled request is run under cProfile and every SQL
+statement it issues is recorded with its timing and ``EXPLAIN`` output
+(``EXPLAIN QUERY PLAN`` on SQLite). Two artifacts are written per request to
+``PROFILING_DIR``:
+
+    <timestamp>_<id>.prof   cProfile stats (open with pstats/snakeviz)
+    <timestamp>_<id>.json   request summary, SQL statements and plans
+
+The profile id is returned in the ``X-Profile-Id`` response header.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from flask import g, request
+from sqlalchemy import event
+
+from .models import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """Collects cProfile stats and SQL statements for a single request."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.profile_id = uuid4().hex[:12]
+        self.profiler = cProfile.Profile()
+        self.queries = []
+        self._thread_id = threading.get_ident()
+        self._started = None
+        self._active = False
+
+    # ------------------------------
+    # SQLAlchemy event hooks
+    # ------------------------------
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != self._thread_id:
+            return
+        conn.info.setdefault('profile_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != self._thread_id:
+            return
+        starts = conn.info.get('profile_query_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+
+        entry = {
+            'statement': statement,
+            'parameters': repr(parameters),
+            'duration_ms': round(elapsed_ms, 3),
+            'plan': None,
+        }
+        # Only read statements are explained; EXPLAIN on writes is not worth the risk
+        if not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            # Keep EXPLAIN overhead out of the cProfile stats
+            self.profiler.disable()
+            try:
+                entry['plan'] = self._explain(conn, cursor, statement, parameters)
+            finally:
+                self.profiler.enable()
+        self.queries.append(entry)
+
+    def _explain(self, conn, cursor, statement, parameters):
+        """Run EXPLAIN for *statement* on the same DBAPI connection."""
+        prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+        # A raw DBAPI cursor bypasses SQLAlchemy events, so EXPLAIN is not itself captured
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            return [' | '.join(str(col) for col in row) for row in explain_cursor.fetchall()]
+        except Exception as e:
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            explain_cursor.close()
+
+    # ------------------------------
+    # Lifecycle
+    # ------------------------------
+    def start(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(self.engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._active = True
+        self._started = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self):
+        if not self._active:
+            return
+        self.profiler.disable()
+        self._active = False
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(self.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def write(self, directory, status_code=None):
+        """Write the .prof and .json artifacts and return the base path."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        base_path = os.path.join(directory, f'{stamp}_{self.profile_id}')
+
+        self.profiler.dump_stats(base_path + '.prof')
+
+        stats_stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stats_stream).sort_stats('cumulative').print_stats(30)
+
+        summary = {
+            'id': self.profile_id,
+            'method': request.method,
+            'path': request.path,
+            'query_string': request.query_string.decode('utf-8', 'replace'),
+            'status_code': status_code,
+            'duration_ms': round((time.perf_counter() - self._started) * 1000.0, 3),
+            'query_count': len(self.queries),
+            'query_time_ms': round(sum(q['duration_ms'] for q in self.queries), 3),
+            'queries': self.queries,
+            'top_functions': stats_stream.getvalue(),
+        }
+        with open(base_path + '.json', 'w', encoding='utf-8') as fh:
+            json.dump(summary, fh, indent=2)
+        return base_path
+
+
+def is_profiling():
+    """Return True if the current request is being profiled."""
+    return g.get('request_profile') is not None
+
+
+def init_profiling(app):
+    """Register the profiling hooks on *app* when PROFILING_ENABLED is set.
+
+    Nothing is registered when profiling is disabled, so the feature has no
+    per-request cost in normal deployments.
+    """
+    if not app.config.get('PROFILING_ENABLED'):
+        return
+
+    header = app.config.get('PROFILING_HEADER', 'X-Debug-Profile')
+    directory = app.config.get('PROFILING_DIR', 'profiles')
+
+    @app.before_request
+    def start_request_profile():
+        if not request.headers.get(header):
+            return
+        g.request_profile = RequestProfile(get_engine())
+        g.request_profile.start()
+
+    @app.after_request
+    def finish_request_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return response
+        profile.stop()
+        try:
+            base_path = profile.write(directory, response.status_code)
+            logger.info(f'Wrote request profile {base_path}')
+            response.headers['X-Profile-Id'] = profile.profile_id
+        except Exception as e:
+            logger.error(f'Failed to write request profile: {e}')
+        return response
+
+    @app.teardown_request
+    def cleanup_request_profile(exception=None):
+        # after_request is skipped on unhandled errors; make sure listeners are detached
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profile.stop()
@@ -0,0 +1,421 @@
+"""Optional in-process read model of the ``jobs`` table.
+
+When ``READ_MODEL_ENABLED`` is set, the live job catalog is loaded into
+memory at startup and ``get_jobs`` answers filter + sort queries from it
+instead of the database:
+
+* rows are ``__slots__`` objects holding the filter fields and the
+  serialised ``to_dict()`` payload;
+* the sort keys (posting age, salary, scraped_on) are kept as ``array('d')``
+  columns with presorted orderings, sorted once on load and then maintained
+  with bisect inserts/removals as rows change;
+* inverted indexes map job type, location, tags, country and city to sets
+  of row slots.
+
+The API process updates the model directly on create/update/delete. Writes
+from other processes (the scraper, other API workers, ``flask archive-jobs``)
+are picked up by a background refresh every ``READ_MODEL_REFRESH_SECONDS``:
+
+* changed rows are found through ``jobs.updated_at``, which is set from the
+  database clock on every insert and update. Each refresh reads only
+  ``(Job_ID, updated_at)`` for rows stamped since shortly before the previous
+  refresh (a lookback, so rows whose transaction committed late are not
+  skipped) and fetches full rows only for stamps it has not applied yet;
+* deleted and archived rows are found by diffing the set of live Job_IDs;
+* every ``READ_MODEL_RELOAD_SECONDS`` the model is reloaded in full as a
+  backstop for writes that bypass both (raw SQL, very long transactions).
+"""
+
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from .models import Job, create_session, normalize_place
+
+logger = logging.getLogger(__name__)
+
+# Filters the read model understands; any other parameter falls back to the database
+_SUPPORTED_PARAMS = {'job_type', 'location', 'country', 'city', 'tag', 'sort'}
+
+# Numeric sort columns kept as arrays (scraped_on is stored as a POSIX timestamp)
+SORT_COLUMNS = ('posting_age_hours', 'salary_numeric', 'scraped_on')
+
+# Stamps this long before the previous refresh's database time are checked again:
+# updated_at is stamped when a statement runs, not when its transaction commits
+_REFRESH_LOOKBACK = timedelta(minutes=5)
+
+# Job_IDs per IN query when fetching rows the change marker did not report
+_FETCH_CHUNK_SIZE = 1000
+
+
+def _sort_values(job):
+    values = {name: getattr(job, name) for name in SORT_COLUMNS}
+    if values['scraped_on'] is not None:
+        values['scraped_on'] = values['scraped_on'].timestamp()
+    return values
+
+
+class _JobRow:
+    """Filter fields and serialised payload of one job."""
+
+    __slots__ = ('job_id', 'job_type', 'location', 'tags', 'tag_tokens', 'country', 'cities', 'data', 'updated_at')
+
+    def __init__(self, job):
+        self.job_id = job.Job_ID
+        self.updated_at = job.updated_at
+        self.job_type = (job.Job_Type or '').lower()
+        self.location = (job.Location or '').lower()
+        self.tags = (job.Tags or '').lower()
+        self.tag_tokens = {t.strip() for t in self.tags.split(',') if t.strip()}
+        # Same normalised rows the database filters on (city-only jobs have country '')
+        locations = job.locations
+        self.country = locations[0].country if locations else ''
+        self.cities = [row.city for row in locations if row.city]
+        self.data = job.to_dict()
+
+    def same_as(self, other):
+        return self.data == other.data and self.country == other.country and self.cities == other.cities
+
+
+class JobReadModel:
+    """Column-oriented, indexed in-memory copy of the live jobs."""
+
+    def __init__(self, refresh_seconds=30, reload_seconds=600):
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+        self._lock = threading.RLock()
+        self._refreshing = False
+        self._version = 0  # bumped by local writes so a concurrent refresh cannot undo them
+        self._reset()
+
+    def _reset(self):
+        self._rows = []                       # slot -> _JobRow or None once removed
+        self._slot_by_id = {}
+        self._sort_columns = {name: array('d') for name in SORT_COLUMNS}
+        self._null_columns = {name: bytearray() for name in SORT_COLUMNS}
+        self._by_job_type = {}
+        self._by_location = {}
+        self._by_tags = {}
+        self._by_tag = {}
+        self._by_country = {}
+        self._by_city = {}
+        self._orderings = {name: [] for name in SORT_COLUMNS}   # ascending list of live slots
+        self._order_keys = {name: [] for name in SORT_COLUMNS}  # _order_key of each entry, for bisect
+        self._dead = 0
+        self._refreshed_at = None             # database now() when the last load/refresh started
+        self._last_refresh = 0.0
+        self._last_reload = 0.0
+
+    # ------------------------------
+    # Loading and incremental maintenance
+    # ------------------------------
+    @staticmethod
+    def _jobs_query(db_session):
+        return db_session.query(Job).options(selectinload(Job.locations))
+
+    def load(self, db_session):
+        """Replace the model with every row of the live jobs table."""
+        version = self._version
+        refreshed_at = db_session.execute(select(func.now())).scalar()
+        entries = [(_JobRow(job), _sort_values(job)) for job in self._jobs_query(db_session)]
+        with self._lock:
+            if version != self._version:
+                self._last_refresh = 0.0  # a local write raced the reload; retry on the next query
+                return
+            self._reset()
+            for row, values in entries:
+                self._append(row, values, ordered=False)
+            self._sort_orderings()
+            self._refreshed_at = refreshed_at
+            self._last_refresh = self._last_reload = time.monotonic()
+        logger.info(f'Job read model loaded {len(entries)} rows')
+
+    def upsert(self, job):
+        """Add or replace *job* (a persisted Job instance)."""
+        row, values = _JobRow(job), _sort_values(job)
+        with self._lock:
+            self._version += 1
+            self._remove(row.job_id)
+            self._append(row, values)
+
+    def remove(self, job_id):
+        with self._lock:
+            self._version += 1
+            self._remove(job_id)
+
+    def refresh(self, db_session):
+        """Apply rows written, updated or deleted by other processes since the last refresh."""
+        if time.monotonic() - self._last_reload >= self.reload_seconds:
+            self.load(db_session)
+            return
+
+        version = self._version
+        # Taken first so rows stamped while this refresh runs fall inside the next window
+        refreshed_at = db_session.execute(select(func.now())).scalar()
+        stamps = select(Job.Job_ID, Job.updated_at).where(Job.updated_at.isnot(None))
+        if self._refreshed_at is not None:
+            stamps = stamps.where(Job.updated_at >= self._refreshed_at - _REFRESH_LOOKBACK)
+        stamps = dict(db_session.execute(stamps).all())
+        live_ids = set(db_session.execute(select(Job.Job_ID)).scalars())
+
+        with self._lock:
+            # Rows whose stamp was not applied yet, plus live rows never held (e.g. never stamped)
+            to_fetch = [job_id for job_id, stamp in stamps.items() if self._stamp(job_id) != stamp]
+            to_fetch += [job_id for job_id in live_ids if job_id not in self._slot_by_id and job_id not in stamps]
+        changed = {}
+        for i in range(0, len(to_fetch), _FETCH_CHUNK_SIZE):
+            chunk = to_fetch[i:i + _FETCH_CHUNK_SIZE]
+            changed.update((job.Job_ID, job) for job in self._jobs_query(db_session).filter(Job.Job_ID.in_(chunk)))
+
+        entries = [(_JobRow(job), _sort_values(job)) for job_id, job in changed.items() if job_id in live_ids]
+        with self._lock:
+            if version != self._version:
+                self._last_refresh = 0.0  # a local write raced this refresh; retry on the next query
+                return
+            deleted = [job_id for job_id in self._slot_by_id if job_id not in live_ids]
+            for job_id in deleted:
+                self._remove(job_id)
+            updated = 0
+            for row, values in entries:
+                if self._replace_if_changed(row, values):
+                    updated += 1
+            self._refreshed_at = refreshed_at
+            self._last_refresh = time.monotonic()
+        if deleted or updated:
+            logger.info(f'Job read model refresh: {updated} rows upserted, {len(deleted)} removed')
+
+    def _stamp(self, job_id):
+        """updated_at of the held copy of *job_id*, or None when it is not held."""
+        slot = self._slot_by_id.get(job_id)
+        return None if slot is None else self._rows[slot].updated_at
+
+    def _replace_if_changed(self, row, values):
+        """Store *row* unless an identical copy is already held; returns True if anything changed."""
+        slot = self._slot_by_id.get(row.job_id)
+        if slot is not None and self._rows[slot].same_as(row) and self._values(slot) == values:
+            self._rows[slot].updated_at = row.updated_at  # Same content, newer stamp: don't fetch it again
+            return False
+        self._remove(row.job_id)
+        self._append(row, values)
+        return True
+
+    def refresh_if_due(self):
+        """Start a background refresh when the last one is older than refresh_seconds."""
+        with self._lock:
+            if self._refreshing or time.monotonic() - self._last_refresh < self.refresh_seconds:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        db_session = create_session()
+        try:
+            self.refresh(db_session)
+        except Exception as e:
+            logger.error(f'Job read model refresh failed: {e}')
+        finally:
+            self._refreshing = False
+            db_session.close()
+
+    def _append(self, row, values, ordered=True):
+        """Store *row* in a new slot with its sort *values* and add it to every index.
+
+        Bulk loads pass ordered=False and call _sort_orderings once at the end.
+        """
+        slot = len(self._rows)
+        self._rows.append(row)
+        self._slot_by_id[row.job_id] = slot
+
+        for name in SORT_COLUMNS:
+            value = values[name]
+            self._sort_columns[name].append(value if value is not None else 0.0)
+            self._null_columns[name].append(value is None)
+
+        self._by_job_type.setdefault(row.job_type, set()).add(slot)
+        self._by_location.setdefault(row.location, set()).add(slot)
+        self._by_tags.setdefault(row.tags, set()).add(slot)
+        for token in row.tag_tokens:
+            self._by_tag.setdefault(token, set()).add(slot)
+        if row.country:
+            self._by_country.setdefault(row.country, set()).add(slot)
+        for city in row.cities:
+            self._by_city.setdefault(city, set()).add(slot)
+
+        if ordered:
+            for name in SORT_COLUMNS:
+                key = self._order_key(name, slot)
+                position = bisect_right(self._order_keys[name], key)
+                self._order_keys[name].insert(position, key)
+                self._orderings[name].insert(position, slot)
+
+    def _remove(self, job_id):
+        slot = self._slot_by_id.pop(job_id, None)
+        if slot is None:
+            return
+        row = self._rows[slot]
+        self._rows[slot] = None
+
+        self._discard(self._by_job_type, row.job_type, slot)
+        self._discard(self._by_location, row.location, slot)
+        self._discard(self._by_tags, row.tags, slot)
+        for token in row.tag_tokens:
+            self._discard(self._by_tag, token, slot)
+        if row.country:
+            self._discard(self._by_country, row.country, slot)
+        for city in row.cities:
+            self._discard(self._by_city, city, slot)
+
+        for name in SORT_COLUMNS:
+            position = bisect_left(self._order_keys[name], self._order_key(name, slot))
+            del self._order_keys[name][position]
+            del self._orderings[name][position]
+
+        self._dead += 1
+        if self._dead > 1000 and self._dead > len(self._slot_by_id):
+            self._compact()
+
+    @staticmethod
+    def _discard(index, key, slot):
+        slots = index.get(key)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del index[key]
+
+    def _values(self, slot):
+        """Sort values stored for *slot* (None for NULL)."""
+        return {
+            name: None if self._null_columns[name][slot] else self._sort_columns[name][slot]
+            for name in SORT_COLUMNS
+        }
+
+    def _compact(self):
+        """Drop removed slots by re-appending the live rows into fresh columns and indexes."""
+        live = [(row, self._values(slot)) for slot, row in enumerate(self._rows) if row is not None]
+        refreshed_at, last_refresh, last_reload = self._refreshed_at, self._last_refresh, self._last_reload
+        self._reset()
+        self._refreshed_at, self._last_refresh, self._last_reload = refreshed_at, last_refresh, last_reload
+        for row, values in live:
+            self._append(row, values, ordered=False)
+        self._sort_orderings()
+
+    # ------------------------------
+    # Querying
+    # ------------------------------
+    @staticmethod
+    def can_answer(args):
+        return set(args) <= _SUPPORTED_PARAMS
+
+    def _order_key(self, name, slot):
+        # NULLs sort after every value, as Postgres does for ascending order; the slot breaks ties
+        return self._null_columns[name][slot], self._sort_columns[name][slot], slot
+
+    def _sort_orderings(self):
+        """Build every ordering from scratch (after a bulk load or compaction)."""
+        live = [slot for slot, row in enumerate(self._rows) if row is not None]
+        for name in SORT_COLUMNS:
+            keys = sorted(self._order_key(name, slot) for slot in live)
+            self._order_keys[name] = keys
+            self._orderings[name] = [key[2] for key in keys]
+
+    @staticmethod
+    def _substring_slots(index, needle):
+        """Union of slots whose index key contains *needle* (ILIKE '%needle%' semantics)."""
+        matched = set()
+        for key, slots in index.items():
+            if needle in key:
+                matched |= slots
+        return matched
+
+    def _matching_slots(self, args):
+        """Return the set of matching slots, or None when no filter applies."""
+        candidates = []
+
+        job_type = args.get('job_type')
+        if job_type:
+            candidates.append(self._substring_slots(self._by_job_type, job_type.lower()))
+
+        location = args.get('location')
+        if location:
+            candidates.append(self._substring_slots(self._by_location, location.lower()))
+
+        country = normalize_place(args.get('country'))
+        if country:
+            candidates.append(self._by_country.get(country, set()))
+
+        city = normalize_place(args.get('city'))
+        if city:
+            candidates.append(self._by_city.get(city, set()))
+
+        tag = args.get('tag')
+        if tag:
+            needle = tag.lower()
+            if ',' in needle or needle != needle.strip():
+                # Could span two tags; match against the full Tags strings instead
+                candidates.append(self._substring_slots(self._by_tags, needle))
+            else:
+                candidates.append(self._substring_slots(self._by_tag, needle))
+
+        if not candidates:
+            return None
+        candidates.sort(key=len)
+        matched = set(candidates[0])
+        for other in candidates[1:]:
+            matched &= other
+            if not matched:
+                break
+        return matched
+
+    def query(self, args, sort_column, descending):
+        """Return serialised jobs matching *args*, ordered by *sort_column* (one of SORT_COLUMNS)."""
+        name = sort_column
+        with self._lock:
+            matched = self._matching_slots(args)
+            ordering = self._orderings[name]
+            if matched is None:
+                slots = ordering
+            elif len(matched) * 8 < len(ordering):
+                # Few matches: sorting them directly beats scanning the whole ordering
+                slots = sorted(matched, key=lambda slot: self._order_key(name, slot))
+            else:
+                slots = [slot for slot in ordering if slot in matched]
+            if descending:
+                slots = reversed(slots)
+            rows = self._rows
+            return [rows[slot].data for slot in slots]
+
+
+_read_model = None
+
+
+def get_read_model():
+    """Return the process-wide JobReadModel, or None when it is disabled."""
+    return _read_model
+
+
+def init_read_model(app):
+    """Load the read model at startup when READ_MODEL_ENABLED is set."""
+    global _read_model
+    if not app.config.get('READ_MODEL_ENABLED') or _read_model is not None:
+        return
+
+    model = JobReadModel(
+        refresh_seconds=app.config.get('READ_MODEL_REFRESH_SECONDS', 30),
+        reload_seconds=app.config.get('READ_MODEL_RELOAD_SECONDS', 600),
+    )
+    db_session = create_session()
+    try:
+        model.load(db_session)
+    except Exception as e:
+        # Fall back to database queries rather than failing to start
+        logger.error(f'Job read model disabled, initial load failed: {e}')
+        return
+    finally:
+        db_session.close()
+    _read_model = model
@@ -1,17 +1,50 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, has_app_context, jsonify, request
 from datetime import datetime
 import hashlib
-from sqlalchemy import asc, desc
+import logging
+import threading
+import time
+from sqlalchemy import asc, desc, exists, select
+from sqlalchemy.exc import IntegrityError
 
 # Import Job model and database session from models.py
-from .models import Job, session
+from .models import ArchivedJob, ArchivedJobLocation, Job, JobLocation, create_session, job_fingerprint, normalize_place, session
+from .profiling import is_profiling
+from .read_model import get_read_model
 
 # All routes defined in this file will automatically be prefixed with /api (set in run.py)
 bp = Blueprint('api', __name__)
 
+logger = logging.getLogger(__name__)
+
 # Simple in-memory cache for query results
 _query_cache = {}
 _cache_timeout = 60  # Cache for 60 seconds
+_cache_stale_timeout = 300  # Expired entries may be served for 5 more minutes while refreshing
+_cache_warm_top_n = 10  # Most-requested keys recomputed after a write
+
+# Serialised rows by Job_ID (id -> (row, cached at)), filled by single and batch lookups
+_job_row_cache = {}
+_row_cache_limit = 10000
+
+# Request counts per cache key (and the params needed to recompute it) for pre-warming
+_cache_key_hits = {}
+_cache_key_params = {}
+_cache_hits_limit = 1000
+
+# Background refresh bookkeeping. The generation is bumped on every write so a
+# refresh that started before the write cannot store pre-write results.
+_cache_lock = threading.Lock()
+_cache_generation = 0
+_refreshing_keys = {}  # cache key -> generation of the refresh in flight
+
+# Post-write warm-ups are coalesced: a write only notes that one is due and a
+# single worker thread runs it once writes pause, so a burst costs one warm-up.
+_cache_warm_delay = 1.0       # Quiet period after the last write before warming
+_cache_warm_max_delay = 5.0   # Warm anyway this long after the first unwarmed write
+_warm_first_request = None    # time.monotonic() of the first write since the last warm-up
+_warm_last_request = None
+_warm_thread = None
 
 def _get_cache_key(params):
     """Generate a cache key from query parameters."""
@@ -23,6 +56,251 @@ def _is_cache_valid(timestamp):
     """Check if cache entry is still valid."""
     return (datetime.utcnow() - timestamp).total_seconds() < _cache_timeout
 
+def _is_cache_servable_stale(timestamp):
+    """Check if an expired entry is still within the stale-while-revalidate window."""
+    return (datetime.utcnow() - timestamp).total_seconds() < _cache_timeout + _cache_stale_timeout
+
+def _record_cache_request(cache_key, params):
+    """Count a request for *cache_key* so the most popular keys can be pre-warmed."""
+    with _cache_lock:
+        _cache_key_hits[cache_key] = _cache_key_hits.get(cache_key, 0) + 1
+        _cache_key_params[cache_key] = params
+        if len(_cache_key_hits) > _cache_hits_limit:
+            # Keep the busiest half and halve their counts so old popularity decays
+            keep = set(sorted(_cache_key_hits, key=_cache_key_hits.get, reverse=True)[:_cache_hits_limit // 2])
+            for key in list(_cache_key_hits):
+                if key in keep:
+                    _cache_key_hits[key] //= 2
+                else:
+                    del _cache_key_hits[key]
+                    _cache_key_params.pop(key, None)
+
+def _background_refresh_enabled():
+    if not has_app_context():
+        return True
+    return current_app.config.get('CACHE_BACKGROUND_REFRESH', True)
+
+def _refresh_cache_entries(keys, generation):
+    """Recompute *keys* and store them unless a write happened meanwhile.
+
+    Each key uses its own short session on the background engine, so the
+    connection goes back to the pool between keys.
+    """
+    try:
+        for cache_key in keys:
+            params = _cache_key_params.get(cache_key)
+            if params is None:
+                continue
+            if generation != _cache_generation:
+                return  # Superseded by a newer write; that write schedules its own warm-up
+            db_session = create_session()
+            try:
+                jobs_data = _query_jobs_data(params, db_session)
+            finally:
+                db_session.close()
+            with _cache_lock:
+                if generation != _cache_generation:
+                    return
+                _query_cache[cache_key] = (jobs_data, datetime.utcnow())
+    except Exception as e:
+        logger.error(f'Background cache refresh failed: {e}')
+    finally:
+        with _cache_lock:
+            for cache_key in keys:
+                if _refreshing_keys.get(cache_key) == generation:
+                    del _refreshing_keys[cache_key]
+
+def _schedule_refresh(keys):
+    """Start one background refresh for the *keys* that are not already being refreshed."""
+    if not _background_refresh_enabled():
+        return
+    with _cache_lock:
+        generation = _cache_generation
+        keys = [key for key in keys if _refreshing_keys.get(key) != generation]
+        if not keys:
+            return
+        for key in keys:
+            _refreshing_keys[key] = generation
+    threading.Thread(target=_refresh_cache_entries, args=(keys, generation), daemon=True).start()
+
+def warm_query_cache():
+    """Ask the warm-up worker to recompute the most-requested get_jobs keys once writes pause."""
+    global _warm_first_request, _warm_last_request, _warm_thread
+    if not _background_refresh_enabled():
+        return
+    now = time.monotonic()
+    with _cache_lock:
+        _warm_last_request = now
+        if _warm_first_request is None:
+            _warm_first_request = now
+        if _warm_thread is not None:
+            return  # The running worker picks up this request
+        _warm_thread = threading.Thread(target=_warm_worker, daemon=True)
+        thread = _warm_thread
+    thread.start()
+
+def _warm_worker():
+    """Run coalesced warm-ups until no write is waiting for one."""
+    global _warm_first_request, _warm_last_request, _warm_thread
+    while True:
+        with _cache_lock:
+            if _warm_first_request is None:
+                _warm_thread = None
+                return
+            due = min(_warm_last_request + _cache_warm_delay, _warm_first_request + _cache_warm_max_delay)
+            wait = due - time.monotonic()
+            if wait <= 0:
+                _warm_first_request = _warm_last_request = None
+                generation = _cache_generation
+                keys = sorted(_cache_key_hits, key=_cache_key_hits.get, reverse=True)[:_cache_warm_top_n]
+                keys = [key for key in keys if _refreshing_keys.get(key) != generation]
+                for key in keys:
+                    _refreshing_keys[key] = generation
+        if wait > 0:
+            time.sleep(wait)
+        elif keys:
+            _refresh_cache_entries(keys, generation)
+
+def _sync_read_model(job=None, deleted_id=None):
+    """Apply a committed write to the in-memory read model, if enabled."""
+    read_model = get_read_model()
+    if read_model is None:
+        return
+    if deleted_id is not None:
+        read_model.remove(deleted_id)
+    if job is not None:
+        read_model.upsert(job)
+
+def _invalidate_cache():
+    """Drop cached query results after a write and pre-warm the popular ones again."""
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        _query_cache.clear()
+        _job_row_cache.clear()
+    warm_query_cache()
+
+def reset_caches():
+    """Forget every cached result and request count, as in a freshly started process (benchmarks)."""
+    global _cache_generation, _warm_first_request, _warm_last_request
+    with _cache_lock:
+        _warm_first_request = _warm_last_request = None
+        _cache_generation += 1
+        _query_cache.clear()
+        _job_row_cache.clear()
+        _cache_key_hits.clear()
+        _cache_key_params.clear()
+        _refreshing_keys.clear()
+
+def _cache_job_rows(rows, generation):
+    """Remember rows fetched by id so repeated single and batch lookups skip the database."""
+    with _cache_lock:
+        if generation != _cache_generation:
+            return
+        now = datetime.utcnow()
+        for row in rows:
+            _job_row_cache.pop(row['id'], None)  # Re-insert so the dict stays in insertion-age order
+            _job_row_cache[row['id']] = (row, now)
+        # Evict the oldest entries (at most BATCH_GET_MAX_IDS per call) instead of clearing everything
+        while len(_job_row_cache) > _row_cache_limit:
+            del _job_row_cache[next(iter(_job_row_cache))]
+
+def _cached_job_row(job_id):
+    if is_profiling():
+        return None  # Profiled lookups always hit the database so their SQL and plans are captured
+    cached = _job_row_cache.get(job_id)
+    if cached is not None and _is_cache_valid(cached[1]):
+        return cached[0]
+    return None
+
+def _is_truthy(value):
+    """Interpret a query-string flag such as ?include_archived=true."""
+    return str(value or '').lower() in ('1', 'true', 'yes')
+
+# Sort option -> (computed column, descending). Unknown values fall back to newest scraped first.
+_SORT_COLUMNS = {
+    'posting_date_desc': ('posting_age_hours', False),  # Newest first - lower hours = more recent
+    'posting_date_asc': ('posting_age_hours', True),    # Oldest first
+    'salary_high': ('salary_numeric', True),            # High to low salary
+    'salary_low': ('salary_numeric', False),            # Low to high salary
+}
+_DEFAULT_SORT_COLUMN = ('scraped_on', True)
+
+def _build_jobs_query(model, args, db_session=session):
+    """Apply the get_jobs filters and sort order to a query over *model* (Job or ArchivedJob)."""
+    query = db_session.query(model)
+
+    # --- Filtering (using indexed columns) ---
+    job_type = args.get('job_type')
+    if job_type:
+        query = query.filter(model.Job_Type.ilike(f"%{job_type}%"))
+
+    # Substring match on the raw Location string (kept for backward compatibility)
+    location = args.get('location')
+    if location:
+        query = query.filter(model.Location.ilike(f"%{location}%"))
+
+    # Exact, index-backed lookups on the normalised location rows (live and archived alike)
+    location_model = JobLocation if model is Job else ArchivedJobLocation
+    country = normalize_place(args.get('country'))
+    if country:
+        query = query.filter(model.Job_ID.in_(
+            select(location_model.Job_ID).where(location_model.country == country)
+        ))
+    city = normalize_place(args.get('city'))
+    if city:
+        query = query.filter(model.Job_ID.in_(
+            select(location_model.Job_ID).where(location_model.city == city)
+        ))
+
+    tag = args.get('tag')
+    if tag:
+        query = query.filter(model.Tags.ilike(f"%{tag}%"))
+
+    # --- Database-level Sorting (much faster than Python sorting) ---
+    attr, descending = _SORT_COLUMNS.get(args.get('sort', 'posting_date_desc'), _DEFAULT_SORT_COLUMN)
+    column = getattr(model, attr)
+    return query.order_by(desc(column) if descending else asc(column))  # type: ignore
+
+def _query_jobs_data(args, db_session, use_read_model=True):
+    """Run the get_jobs query for *args* and return the serialised rows."""
+    read_model = get_read_model()
+    if use_read_model and read_model is not None and read_model.can_answer(args):
+        # Answered from the in-memory copy without touching the database
+        read_model.refresh_if_due()
+        attr, descending = _SORT_COLUMNS.get(args.get('sort', 'posting_date_desc'), _DEFAULT_SORT_COLUMN)
+        return read_model.query(args, attr, descending)
+
+    jobs = _build_jobs_query(Job, args, db_session).all()
+
+    if _is_truthy(args.get('include_archived')):
+        # Archived rows are an explicit opt-in; the default path only scans the live table
+        archived_jobs = _build_jobs_query(ArchivedJob, args, db_session).all()
+        jobs = _merge_archived(jobs, archived_jobs, args.get('sort', 'posting_date_desc'))
+
+    # Convert to dict (this is still needed for JSON serialization)
+    return [job.to_dict() for job in jobs]
+
+def _fingerprint_taken(fingerprint, exclude_id=None):
+    """Return True if another live job already has *fingerprint* (one indexed EXISTS)."""
+    condition = Job.fingerprint == fingerprint
+    if exclude_id is not None:
+        condition = condition & (Job.Job_ID != exclude_id)
+    # Pending changes on the job being edited must not be flushed by this check
+    with session.no_autoflush:
+        return session.query(exists().where(condition)).scalar()
+
+def _merge_archived(jobs, archived_jobs, sort):
+    """Combine live and archived results in sort order; a live row wins over an archived copy."""
+    live_ids = {job.Job_ID for job in jobs}
+    combined = jobs + [job for job in archived_jobs if job.Job_ID not in live_ids]
+    attr, descending = _SORT_COLUMNS.get(sort, _DEFAULT_SORT_COLUMN)
+
+    present = [job for job in combined if getattr(job, attr) is not None]
+    missing = [job for job in combined if getattr(job, attr) is None]
+    present.sort(key=lambda job: getattr(job, attr), reverse=descending)
+    return present + missing
+
 # ==============================================================================
 # 1. RETRIEVE JOBS (GET /api/jobs) with Filtering & Sorting - OPTIMIZED
 # ==============================================================================
@@ -30,6 +308,11 @@ def _is_cache_valid(timestamp):
 def get_jobs():
     """Fetch a list of jobs with optional filtering and sorting - OPTIMIZED VERSION."""
     
+    # ?ids=a,b,c switches to a batch lookup by primary key
+    if 'ids' in request.args:
+        job_ids = [job_id.strip() for job_id in request.args['ids'].split(',')]
+        return _batch_get_response(job_ids, _is_truthy(request.args.get('include_archived')))
+
     # Generate cache key from request parameters (including sort)
     params_for_cache = request.args.to_dict()
     
@@ -39,67 +322,42 @@ def get_jobs():
     
     cache_key = _get_cache_key(params_for_cache)
     
-    # Check cache first
-    if cache_key in _query_cache:
-        cached_data, timestamp = _query_cache[cache_key]
+    _record_cache_request(cache_key, params_for_cache)
+
+    # Check cache first (profiled requests always hit the database)
+    cached = _query_cache.get(cache_key)
+    if cached is not None and not is_profiling():
+        cached_data, timestamp = cached
+        cache_status = None
         if _is_cache_valid(timestamp):
+            cache_status = 'HIT'
+        elif _background_refresh_enabled() and _is_cache_servable_stale(timestamp):
+            # Stale-while-revalidate: answer from the expired entry, refresh it in the background
+            _schedule_refresh([cache_key])
+            cache_status = 'STALE'
+        if cache_status:
             response = jsonify(cached_data)
             response.headers['Cache-Control'] = 'public, max-age=60'
-            response.headers['X-Cache'] = 'HIT'
+            response.headers['X-Cache'] = cache_status
             return response
 
-    # Begin with base query
-    query = Job.query()
-
-    # --- Filtering (using indexed columns) ---
-    job_type = request.args.get('job_type')
-    if job_type:
-        query = query.filter(Job.Job_Type.ilike(f"%{job_type}%"))
-
-    location = request.args.get('location')
-    if location:
-        query = query.filter(Job.Location.ilike(f"%{location}%"))
-
-    tag = request.args.get('tag')
-    if tag:
-        query = query.filter(Job.Tags.ilike(f"%{tag}%"))
-
-    # --- Database-level Sorting (much faster than Python sorting) ---
-    sort = request.args.get('sort', 'posting_date_desc')
-
-    if sort == 'posting_date_desc':
-        # Newest first - use computed column for fast sorting
-        query = query.order_by(asc(Job.posting_age_hours))  # type: ignore # Lower hours = more recent
-    elif sort == 'posting_date_asc':
-        # Oldest first
-        query = query.order_by(desc(Job.posting_age_hours))  # type: ignore
-    elif sort == 'salary_high':
-        # High to low salary - use computed column
-        query = query.order_by(desc(Job.salary_numeric))  # type: ignore
-    elif sort == 'salary_low':
-        # Low to high salary
-        query = query.order_by(asc(Job.salary_numeric))  # type: ignore
-    else:
-        # Default sorting (newest first by scraped_on)
-        query = query.order_by(Job.scraped_on.desc())
-
-    # Execute query once with all filters and sorting applied
-    jobs = query.all()
-
-    # Convert to dict (this is still needed for JSON serialization)
-    jobs_data = [job.to_dict() for job in jobs]
+    generation = _cache_generation
+    # Profiled requests skip the read model so their SQL and query plans are captured
+    jobs_data = _query_jobs_data(params_for_cache, session, use_read_model=not is_profiling())
     
-    # Cache the result with sort parameter included in key
-    _query_cache[cache_key] = (jobs_data, datetime.utcnow())
+    # Cache the result with sort parameter included in key (unless a write invalidated it meanwhile)
+    with _cache_lock:
+        if generation == _cache_generation:
+            _query_cache[cache_key] = (jobs_data, datetime.utcnow())
     
     # Clean old cache entries (simple cleanup)
     if len(_query_cache) > 100:  # Limit cache size
         expired_keys = [
-            k for k, (_, timestamp) in _query_cache.items() 
-            if not _is_cache_valid(timestamp)
+            k for k, (_, timestamp) in list(_query_cache.items())
+            if not _is_cache_servable_stale(timestamp)
         ]
         for k in expired_keys:
-            del _query_cache[k]
+            _query_cache.pop(k, None)
     
     # Add cache headers for better frontend performance
     response = jsonify(jobs_data)
@@ -131,15 +389,9 @@ def create_job():
     title = data['title'].strip()
     company = data['company'].strip()
     
-    # Use EXISTS for better performance than .first()
-    from sqlalchemy import exists
-    duplicate_exists = session.query(
-        exists().where(
-            (Job.Job_Title == title) & (Job.Company_Name == company)
-        )
-    ).scalar()
-    
-    if duplicate_exists:
+    # Single indexed EXISTS on the normalised fingerprint; also catches near-duplicates
+    # such as "Sr. Actuary" at "Acme, Inc." vs "Senior Actuary" at "ACME Inc"
+    if _fingerprint_taken(job_fingerprint(title, company)):
         return jsonify({'error': 'A job with the same title and company already exists.'}), 409
 
     from uuid import uuid4
@@ -172,14 +424,21 @@ def create_job():
         scraped_on=datetime.utcnow(),
     )
     
-    # Compute performance fields
+    # Compute performance fields and the normalised job_locations rows
     new_job.update_computed_fields()
+    new_job.update_locations()
 
     session.add(new_job)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # uq_title_company still guards exact duplicates of rows without a fingerprint
+        session.rollback()
+        return jsonify({'error': 'A job with the same title and company already exists.'}), 409
     
-    # Clear cache since data has changed
-    _query_cache.clear()
+    # Clear cache since data has changed and re-warm the popular queries
+    _sync_read_model(job=new_job)
+    _invalidate_cache()
 
     return jsonify(new_job.to_dict()), 201
 
@@ -189,12 +448,71 @@ def create_job():
 # ==============================================================================
 @bp.route('/jobs/<string:job_id>', methods=['GET'])
 def get_job(job_id):
+    cached_row = _cached_job_row(job_id)
+    if cached_row is not None:
+        return jsonify(cached_row)
+
+    generation = _cache_generation
     job = session.get(Job, job_id)
+    if job:
+        row = job.to_dict()
+        _cache_job_rows([row], generation)
+        return jsonify(row)
+
+    if _is_truthy(request.args.get('include_archived')):
+        job = session.get(ArchivedJob, job_id)
     if not job:
         return jsonify({'error': 'Job not found'}), 404
     return jsonify(job.to_dict())
 
 
+# ==============================================================================
+# 3b. RETRIEVE SEVERAL JOBS BY ID (POST /api/jobs/batch-get, GET /api/jobs?ids=...)
+# ==============================================================================
+@bp.route('/jobs/batch-get', methods=['POST'])
+def batch_get_jobs():
+    data = request.get_json(silent=True)
+    job_ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+        return jsonify({'error': 'Field "ids" must be a list of job IDs.'}), 400
+    return _batch_get_response(job_ids, _is_truthy(data.get('include_archived')))
+
+
+def _batch_get_response(job_ids, include_archived=False):
+    """Fetch *job_ids* with one IN query, preserving request order and reporting missing IDs."""
+    # Drop blanks and repeats while keeping the order of first appearance
+    job_ids = list(dict.fromkeys(job_id.strip() for job_id in job_ids if job_id and job_id.strip()))
+    if not job_ids:
+        return jsonify({'error': 'At least one job ID is required.'}), 400
+
+    max_ids = current_app.config.get('BATCH_GET_MAX_IDS', 100)
+    if len(job_ids) > max_ids:
+        return jsonify({'error': f'At most {max_ids} job IDs can be requested at once.'}), 400
+
+    found = {}
+    for job_id in job_ids:
+        cached_row = _cached_job_row(job_id)
+        if cached_row is not None:
+            found[job_id] = cached_row
+
+    to_load = [job_id for job_id in job_ids if job_id not in found]
+    if to_load:
+        generation = _cache_generation
+        rows = [job.to_dict() for job in session.query(Job).filter(Job.Job_ID.in_(to_load))]
+        _cache_job_rows(rows, generation)
+        found.update((row['id'], row) for row in rows)
+
+        remaining = [job_id for job_id in to_load if job_id not in found]
+        if remaining and include_archived:
+            archived = session.query(ArchivedJob).filter(ArchivedJob.Job_ID.in_(remaining))
+            found.update((job.Job_ID, job.to_dict()) for job in archived)
+
+    return jsonify({
+        'jobs': [found[job_id] for job_id in job_ids if job_id in found],
+        'missing': [job_id for job_id in job_ids if job_id not in found],
+    })
+
+
 # ==============================================================================
 # 4. UPDATE A JOB (PUT /api/jobs/<id>)
 # ==============================================================================
@@ -219,8 +537,10 @@ def update_job(job_id):
     
     if 'title' in data:
         updates['Job_Title'] = data['title'].strip()
+        needs_compute_update = True  # Title change requires a new fingerprint
     if 'company' in data:
         updates['Company_Name'] = data['company'].strip()
+        needs_compute_update = True  # Company change requires a new fingerprint
     if 'location' in data:
         updates['Location'] = data['location'].strip()
     if 'job_type' in data:
@@ -233,19 +553,38 @@ def update_job(job_id):
         updates['Salary'] = salary_value.strip() if salary_value and salary_value.strip() else 'Not specified'
         needs_compute_update = True  # Salary change requires recomputing numeric value
 
+    # Near-duplicate check on the new title/company before the job is touched
+    if 'Job_Title' in updates or 'Company_Name' in updates:
+        new_fingerprint = job_fingerprint(updates.get('Job_Title', job.Job_Title),
+                                          updates.get('Company_Name', job.Company_Name))
+        if _fingerprint_taken(new_fingerprint, job.Job_ID):
+            return jsonify({'error': 'A job with the same title and company already exists.'}), 409
+
     # Apply updates if any
     if updates:
-        for attr, value in updates.items():
-            setattr(job, attr, value)
-        
-        # Update computed fields if salary changed
-        if needs_compute_update:
-            job.update_computed_fields()
-
-    session.commit()
+        # Loading the old job_locations rows must not autoflush the half-applied
+        # UPDATE; uq_title_company violations surface at commit below instead
+        with session.no_autoflush:
+            for attr, value in updates.items():
+                setattr(job, attr, value)
+
+            # Update computed fields if salary, title or company changed
+            if needs_compute_update:
+                job.update_computed_fields()
+            # Only an explicit new location rebuilds job_locations; the scraper may
+            # have stored structured rows (e.g. city-only) the string cannot express
+            if 'Location' in updates:
+                job.update_locations()
+
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return jsonify({'error': 'A job with the same title and company already exists.'}), 409
     
-    # Clear cache since data has changed
-    _query_cache.clear()
+    # Clear cache since data has changed and re-warm the popular queries
+    _sync_read_model(job=job)
+    _invalidate_cache()
     
     return jsonify(job.to_dict())
 
@@ -262,7 +601,8 @@ def delete_job(job_id):
     session.delete(job)
     session.commit()
     
-    # Clear cache since data has changed
-    _query_cache.clear()
+    # Clear cache since data has changed and re-warm the popular queries
+    _sync_read_model(deleted_id=job_id)
+    _invalidate_cache()
 
     return '', 204
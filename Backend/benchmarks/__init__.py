@@ -0,0 +1,4 @@
+"""Load and latency benchmarks for the jobs API.
+
+Run ``python -m Backend.benchmarks --help`` from the project root.
+"""
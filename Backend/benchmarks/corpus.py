@@ -0,0 +1,174 @@
+"""Synthetic job corpus generator used by the benchmark suite.
+
+Produces realistic-looking ``Job`` rows (salary ranges, relative and ISO
+posting dates, tag lists, multi-city locations) from a seeded RNG so that
+runs on different commits benchmark the same data.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from ..api.models import Job, JobLocation, job_fingerprint, location_rows
+
+LEVELS = ['', 'Junior', 'Senior', 'Sr.', 'Lead', 'Principal', 'Associate', 'Chief', 'Assistant', 'Staff']
+SPECIALTIES = [
+    'Pricing', 'Reserving', 'Life', 'Health', 'Pension', 'Property & Casualty', 'Capital Modeling',
+    'Valuation', 'Reinsurance', 'Risk', 'Annuity', 'IFRS 17', 'Predictive Analytics', 'Commercial Lines',
+    'Personal Lines', 'Experience Studies', 'Financial Reporting', 'Catastrophe',
+]
+ROLES = ['Actuary', 'Actuarial Analyst', 'Actuarial Manager', 'Actuarial Consultant', 'Data Scientist',
+         'Actuarial Intern', 'Actuarial Director', 'Actuarial Associate', 'Pricing Analyst', 'Modeler']
+
+COMPANY_PREFIXES = [
+    'Acme', 'Northwind', 'Summit', 'Pinnacle', 'Harbor', 'Liberty', 'Guardian', 'Keystone', 'Evergreen',
+    'Atlas', 'Beacon', 'Crescent', 'Frontier', 'Granite', 'Horizon', 'Ironwood', 'Juniper', 'Lakeside',
+    'Meridian', 'Oakridge', 'Paragon', 'Redwood', 'Sterling', 'Trinity', 'Unity', 'Vanguard', 'Westbrook',
+    'Zenith', 'Bluewater', 'Cobalt',
+]
+COMPANY_MIDDLES = [
+    'Mutual', 'Life', 'Re', 'Insurance', 'Health', 'Capital', 'Assurance', 'Risk', 'Financial', 'General',
+    'Casualty', 'Benefits', 'Partners', 'Analytics', 'Holdings', 'Global', 'National', 'Specialty',
+    'Indemnity', 'Underwriters',
+]
+COMPANY_REGIONS = ['', 'of America', 'North America', 'Europe', 'UK', 'Canada', 'Asia Pacific', 'US',
+                   'International', 'Services']
+COMPANY_SUFFIXES = ['', 'Inc', 'Inc.', 'LLC', 'Ltd', 'Group', 'Corp', 'Company', 'plc', 'AG']
+
+LOCATIONS = {
+    'United States': ['New York', 'Boston', 'Chicago', 'Hartford', 'Des Moines', 'Philadelphia', 'Atlanta',
+                      'Dallas', 'Columbus', 'Omaha', 'Minneapolis', 'San Francisco', 'Remote'],
+    'United Kingdom': ['London', 'Manchester', 'Edinburgh', 'Leeds', 'Bristol', 'Remote'],
+    'Canada': ['Toronto', 'Montreal', 'Waterloo', 'Vancouver', 'Remote'],
+    'Ireland': ['Dublin', 'Cork'],
+    'Germany': ['Munich', 'Cologne', 'Frankfurt'],
+    'Switzerland': ['Zurich', 'Geneva'],
+    'Bermuda': ['Hamilton'],
+    'India': ['Bengaluru', 'Gurugram', 'Mumbai'],
+    'Australia': ['Sydney', 'Melbourne'],
+}
+
+TAGS = [
+    'Life', 'Health', 'Pension', 'P&C', 'Pricing', 'Reserving', 'Entry Level', 'Mid Level', 'Senior Level',
+    'ASA', 'FSA', 'ACAS', 'FCAS', 'Python', 'R', 'SQL', 'Excel', 'VBA', 'Prophet', 'AXIS', 'Remote',
+    'Hybrid', 'Reinsurance', 'Consulting', 'Internship', 'Contract', 'Part-Time',
+]
+
+RELATIVE_DATES = ['Just now', 'Recently posted', '{h}h ago', '{d}d ago', '{w}w ago',
+                  '{h} hours ago', '{d} days ago', '{w} weeks ago']
+
+
+def _salary(rng):
+    """Return a salary string in one of the formats seen on ActuaryList."""
+    roll = rng.random()
+    if roll < 0.25:
+        return 'Not specified'
+    low = rng.randrange(50, 250, 5)
+    high = low + rng.randrange(10, 80, 5)
+    if roll < 0.55:
+        return f'{low}-{high}k'
+    if roll < 0.70:
+        return f'${low}k'
+    if roll < 0.85:
+        return f'${low * 1000:,} - ${high * 1000:,}'
+    return f'£{low}k-£{high}k'
+
+
+def _posting_date(rng, now):
+    """Return either a relative ("17d ago") or an absolute ISO posting date."""
+    if rng.random() < 0.7:
+        template = rng.choice(RELATIVE_DATES)
+        return template.format(h=rng.randint(1, 23), d=rng.randint(1, 30), w=rng.randint(1, 8))
+    posted = now - timedelta(hours=rng.randint(1, 24 * 120))
+    if rng.random() < 0.5:
+        return posted.strftime('%Y-%m-%d')
+    return posted.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _location(rng):
+    country = rng.choice(list(LOCATIONS))
+    cities = rng.sample(LOCATIONS[country], k=min(len(LOCATIONS[country]), rng.choice([1, 1, 1, 2, 3])))
+    return ', '.join([country] + cities)
+
+
+def _job_type(tags_list):
+    """Mirror the scraper's job type heuristics."""
+    tags_lower = ','.join(tags_list).lower()
+    if 'intern' in tags_lower:
+        return 'Internship'
+    if 'contract' in tags_lower:
+        return 'Contract'
+    if 'part-time' in tags_lower or 'part time' in tags_lower:
+        return 'Part-Time'
+    return 'Full-Time'
+
+
+def generate_jobs(count, seed=42):
+    """Yield *count* unsaved ``Job`` objects with computed fields populated."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    seen = set()
+    # "Sr."/"Senior" and the legal-form suffixes collapse to the same fingerprint
+    max_pairs = (len(set(LEVELS)) - 1) * len(SPECIALTIES) * len(ROLES) * len(COMPANY_PREFIXES) \
+        * len(COMPANY_MIDDLES) * len(COMPANY_REGIONS) * 2
+    if count > max_pairs // 4:
+        raise ValueError(f'Corpus size {count} too large for the title/company vocabulary')
+
+    for i in range(count):
+        # Fingerprints must be unique, otherwise the jobs are near-duplicates of each other
+        while True:
+            title = ' '.join(p for p in (rng.choice(LEVELS), rng.choice(SPECIALTIES), rng.choice(ROLES)) if p)
+            company = ' '.join(p for p in (rng.choice(COMPANY_PREFIXES), rng.choice(COMPANY_MIDDLES),
+                                           rng.choice(COMPANY_REGIONS), rng.choice(COMPANY_SUFFIXES)) if p)
+            fingerprint = job_fingerprint(title, company)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                break
+
+        tags_list = rng.sample(TAGS, k=rng.randint(1, 5))
+        job = Job(
+            Job_ID=f'bench-{i}',
+            Job_Title=title,
+            Company_Name=company,
+            Location=_location(rng),
+            Posting_Date=_posting_date(rng, now),
+            Job_URL=f'https://www.actuarylist.com/actuarial-jobs/{100000 + i}',
+            Company_URL=f'https://www.actuarylist.com/actuarial-employers/{company.lower().replace(" ", "-")}',
+            Salary=_salary(rng),
+            Tags=', '.join(tags_list),
+            Job_Type=_job_type(tags_list),
+            scraped_on=now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+        )
+        job.update_computed_fields()
+        yield job
+
+
+def _row(job):
+    # Columns with a server default (updated_at) are left to the database
+    return {column.name: getattr(job, column.name) for column in Job.__table__.columns
+            if column.server_default is None}
+
+
+def _flush(db_session, batch, location_batch):
+    db_session.execute(insert(Job), batch)
+    if location_batch:
+        db_session.execute(insert(JobLocation), location_batch)
+    db_session.commit()
+
+
+def load_corpus(db_session, count, seed=42, batch_size=5000):
+    """Insert a synthetic corpus of *count* jobs in batches and return the count."""
+    batch, location_batch = [], []
+    inserted = 0
+    for job in generate_jobs(count, seed=seed):
+        batch.append(_row(job))
+        location_batch.extend({'Job_ID': job.Job_ID, **row} for row in location_rows(job.Location))
+        if len(batch) >= batch_size:
+            _flush(db_session, batch, location_batch)
+            inserted += len(batch)
+            batch, location_batch = [], []
+    if batch:
+        _flush(db_session, batch, location_batch)
+        inserted += len(batch)
+    return inserted
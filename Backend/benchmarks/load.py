@@ -0,0 +1,129 @@
+"""Request drivers used by the benchmark runner.
+
+A request is a ``(method, path, options, cold)`` tuple: ``options`` are the
+keyword arguments for the Flask test client and ``cold`` drops the
+in-process caches before the request is sent.
+
+``InProcessDriver`` sends requests one after another through a test client.
+``ProcessPoolDriver`` spreads them over worker processes that each run their
+own app, database connection and caches (as several gunicorn workers would),
+so concurrent requests really compete for the database. Each driver reports
+the wall-clock time of a batch so throughput reflects the concurrency.
+"""
+
+import multiprocessing
+import os
+import time
+
+
+def _issue(client, request):
+    """Send one request and return its latency in milliseconds."""
+    method, path, options, cold = request
+    if cold:
+        from ..api.routes import reset_caches
+        reset_caches()
+    start = time.perf_counter()
+    response = client.open(path, method=method, **options)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    if response.status_code >= 500:
+        raise RuntimeError(f'{method} {path} returned {response.status_code}')
+    return elapsed_ms
+
+
+class InProcessDriver:
+    """Sequential requests through a test client of *app*."""
+
+    concurrency = 1
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def prime(self, request):
+        _issue(self.client, request)
+
+    def run(self, requests):
+        """Send *requests* and return (latencies in request order, wall-clock seconds)."""
+        started = time.perf_counter()
+        latencies = [_issue(self.client, request) for request in requests]
+        return latencies, time.perf_counter() - started
+
+    def close(self):
+        pass
+
+
+def _worker(index, database_url, read_model, tasks, results):
+    """Worker process loop: build an app, then run each batch of requests from *tasks*."""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['READ_MODEL_ENABLED'] = '1' if read_model else '0'
+    try:
+        from ..run import create_app
+        client = create_app().test_client()
+    except Exception as e:
+        results.put((index, 'error', f'worker failed to start: {e}'))
+        return
+    results.put((index, 'ok', None))
+
+    for requests in iter(tasks.get, None):
+        try:
+            results.put((index, 'ok', [_issue(client, request) for request in requests]))
+        except Exception as e:
+            results.put((index, 'error', str(e)))
+
+
+class ProcessPoolDriver:
+    """Requests spread round-robin over *concurrency* worker processes."""
+
+    def __init__(self, database_url, read_model, concurrency):
+        # spawn, not fork: a forked child would share the parent's database connections
+        context = multiprocessing.get_context('spawn')
+        self.concurrency = concurrency
+        self._results = context.Queue()
+        self._tasks = [context.Queue() for _ in range(concurrency)]
+        self._workers = [
+            context.Process(target=_worker, args=(index, database_url, read_model, tasks, self._results),
+                            daemon=True)
+            for index, tasks in enumerate(self._tasks)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._collect()
+
+    def _collect(self):
+        """Wait for one reply per worker and return the payloads in worker order."""
+        payloads = [None] * self.concurrency
+        errors = []
+        for _ in range(self.concurrency):
+            index, status, payload = self._results.get()
+            if status == 'error':
+                errors.append(payload)
+            payloads[index] = payload
+        if errors:
+            raise RuntimeError(errors[0])
+        return payloads
+
+    def prime(self, request):
+        """Send *request* once from every worker so each has a warm cache."""
+        for tasks in self._tasks:
+            tasks.put([request])
+        self._collect()
+
+    def run(self, requests):
+        """Send *requests* concurrently and return (latencies in request order, wall-clock seconds)."""
+        started = time.perf_counter()
+        for index, tasks in enumerate(self._tasks):
+            tasks.put(requests[index::self.concurrency])
+        slices = self._collect()
+        wall_seconds = time.perf_counter() - started
+
+        latencies = [None] * len(requests)
+        for index, values in enumerate(slices):
+            latencies[index::self.concurrency] = values
+        return latencies, wall_seconds
+
+    def close(self):
+        for tasks in self._tasks:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
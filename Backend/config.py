@@ -16,4 +16,39 @@ class Config:
     # Number of pages the Selenium scraper should process. Defaults to `2`.
     PAGES_TO_SCRAPE = int(os.getenv('PAGES_TO_SCRAPE', '2'))
 
+    # --- API configuration ---
+    # Maximum number of IDs accepted by GET /api/jobs?ids=... and POST /api/jobs/batch-get.
+    BATCH_GET_MAX_IDS = int(os.getenv('BATCH_GET_MAX_IDS', '100'))
+
+    # --- Query cache ---
+    # Refresh stale GET /api/jobs entries and re-warm popular ones after writes in
+    # background threads. Off by default on Vercel, which freezes the process
+    # between requests; expired entries are then recomputed on the next request.
+    CACHE_BACKGROUND_REFRESH = os.getenv(
+        'CACHE_BACKGROUND_REFRESH', 'false' if os.getenv('VERCEL') else 'true'
+    ).lower() in ('1', 'true', 'yes')
+
+    # --- In-memory read model ---
+    # Keep an indexed in-process copy of the jobs table and answer GET /api/jobs from it.
+    READ_MODEL_ENABLED = os.getenv('READ_MODEL_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    # How often the copy checks the database for writes made by other processes (scraper).
+    READ_MODEL_REFRESH_SECONDS = int(os.getenv('READ_MODEL_REFRESH_SECONDS', '30'))
+    # How often the copy is rebuilt from scratch, as a backstop for missed changes.
+    READ_MODEL_RELOAD_SECONDS = int(os.getenv('READ_MODEL_RELOAD_SECONDS', '600'))
+
+    # --- Retention configuration ---
+    # Jobs not seen by the scraper (scraped_on) for this many days are moved to
+    # jobs_archive by `flask archive-jobs`.
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '90'))
+    # Jobs moved per transaction; keeps row locks short on the live table.
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+
+    # --- Profiling configuration ---
+    # Opt-in per-request profiler. When enabled, requests carrying PROFILING_HEADER
+    # are run under cProfile and every SQL statement is captured with its query plan.
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    PROFILING_HEADER = os.getenv('PROFILING_HEADER', 'X-Debug-Profile')
+    # Directory where profile artifacts (.prof + .json) are written.
+    PROFILING_DIR = os.getenv('PROFILING_DIR', 'profiles')
+
     # Add future configuration variables below as needed
\ No newline at end of file
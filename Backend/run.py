@@ -35,6 +35,18 @@ def create_app(config_class=Config):
             pass
         return jsonify({'error': 'Internal server error'}), 500
 
+    # Opt-in request profiler (no-op unless PROFILING_ENABLED is set)
+    from .api.profiling import init_profiling
+    init_profiling(app)
+
+    # Optional in-memory read model for GET /api/jobs (no-op unless READ_MODEL_ENABLED is set)
+    from .api.read_model import init_read_model
+    init_read_model(app)
+
+    # Maintenance CLI commands (flask backfill-locations, ...)
+    from .api.commands import register_commands
+    register_commands(app)
+
     # Import and register blueprints with /api prefix
     from .api.routes import bp as api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
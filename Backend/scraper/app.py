@@ -17,7 +17,7 @@ import sys, pathlib
 project_root = pathlib.Path(__file__).resolve().parent.parent.parent  # BitBashPrj/
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
-from Backend.api.models import Job, session  # type: ignore
+from Backend.api.models import Job, drop_duplicate_jobs, session  # type: ignore
 
 
 # ---------- Helper utilities ----------
@@ -77,6 +77,7 @@ for current_page in range(1, pages_to_scrape + 1):
     logger.info(f"Page {current_page}: Found {len(potential_cards)} potential cards")
 
     job_cards = []
+    page_jobs = []
     company_css = "p[class*='job-card__company']"
     for card in potential_cards:
         if card.find_elements(By.CSS_SELECTOR, company_css):
@@ -100,6 +101,7 @@ for current_page in range(1, pages_to_scrape + 1):
             # LOCATION block: limit to the dedicated locations container to exclude tags
             loc_container_css = "div[class*='job-card__locations']"
             location = ""
+            country_name, cities = "", []
             try:
                 loc_container = card.find_element(By.CSS_SELECTOR, loc_container_css)
                 # country
@@ -118,6 +120,7 @@ for current_page in range(1, pages_to_scrape + 1):
                 location = ", ".join(location_parts)
             except NoSuchElementException:
                 location = "Remote"  # Default fallback
+                country_name, cities = "Remote", []
                 
             # Skip jobs with no location data
             if not location:
@@ -179,24 +182,37 @@ for current_page in range(1, pages_to_scrape + 1):
             )
 
             # --------------------------------------------------------------
-            # Compute derived fields (salary_numeric & posting_age_hours)
-            # BEFORE persisting so that database-level sorting works.
+            # Compute derived fields (salary_numeric, posting_age_hours, the
+            # fingerprint and the normalised job_locations rows) BEFORE persisting so that
+            # database-level sorting and country/city lookups work.
             # This ensures that jobs with "Just now" or other relative
             # dates receive a posting_age_hours close to 0, making them
             # appear first when sorting by newest.
             # --------------------------------------------------------------
             job_obj.update_computed_fields()
-
-            # Attempt to merge the job into the database
-            try:
-                session.merge(job_obj)          # DB UPSERT
-                session.flush()                 # Force immediate insert/update
-            except Exception as e:
-                session.rollback()              # Clear the failed transaction
-                logger.error(f'Skipping job {job_id}: {e}')
-            # Commit is handled outside the loop
+            # Index the scraped country/cities directly: a city-only Location
+            # string would otherwise have its first city read as the country
+            job_obj.set_locations(country_name, cities)
+            page_jobs.append(job_obj)
         except NoSuchElementException:
             continue
+
+    # Near-duplicate check for the whole page with one set-based fingerprint
+    # lookup instead of a query per job. Re-scraped listings (same Job_ID)
+    # are kept so they are upserted as before.
+    page_jobs, duplicates = drop_duplicate_jobs(session, page_jobs)
+    for dup in duplicates:
+        logger.info(f"Skipping near-duplicate job {dup.Job_ID}: '{dup.Job_Title}' at '{dup.Company_Name}'")
+
+    for job_obj in page_jobs:
+        # Attempt to merge the job into the database
+        try:
+            session.merge(job_obj)          # DB UPSERT
+            session.flush()                 # Force immediate insert/update
+        except Exception as e:
+            session.rollback()              # Clear the failed transaction
+            logger.error(f'Skipping job {job_obj.Job_ID}: {e}')
+        # Commit is handled outside the loop
     
     if current_page == pages_to_scrape:
         break  # finished requested pages; loop will exit naturally